@@ -0,0 +1,183 @@
+"""Async HTTP client for Crossref used to overlap DOI lookups in batch runs."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from typing import Any, Dict, Iterable, List, Optional
+
+import aiohttp
+import orjson
+
+from .crossref_cache import CrossrefDiskCache
+from .crossref_client import (
+    MetadataCache,
+    bulk_filter_params,
+    index_bulk_items,
+    normalize_doi,
+    polite_headers,
+    split_cached,
+)
+from .errors import MetaError, MetaErrorCode
+
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncCrossrefClient:
+    def __init__(
+        self,
+        *,
+        mailto: str | None = None,
+        timeout: float = 15,
+        max_retries: int = 2,
+        backoff: float = 1.5,
+        cache: Optional[MetadataCache] = None,
+    ) -> None:
+        self.base_url = "https://api.crossref.org/works"
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.mailto, self.headers = polite_headers(mailto)
+        self.cache = cache if cache is not None else MetadataCache(disk=CrossrefDiskCache())
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._inflight: Dict[str, asyncio.Task] = {}
+
+    async def __aenter__(self) -> "AsyncCrossrefClient":
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        await self.close()
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        # aiohttp sessions are bound to the loop that created them; batch runs
+        # each spin up a fresh loop via asyncio.run, so rebuild when it changes.
+        loop = asyncio.get_running_loop()
+        if self._session is None or self._session.closed or self._loop is not loop:
+            self._session = aiohttp.ClientSession(
+                headers=self.headers,
+                timeout=aiohttp.ClientTimeout(total=self.timeout),
+                connector=aiohttp.TCPConnector(limit=32, limit_per_host=16, ttl_dns_cache=300),
+            )
+            self._loop = loop
+            self._inflight = {}
+        return self._session
+
+    async def open(self) -> None:
+        """Create the pooled session ahead of the first lookup (e.g. at app start-up)."""
+
+        self._get_session()
+
+    async def close(self) -> None:
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+        self._loop = None
+
+    async def fetch_metadata(self, doi: str) -> Dict[str, Any]:
+        doi = normalize_doi(doi)
+        # The cache may fall through to SQLite, so it is consulted off the loop.
+        cached = await asyncio.to_thread(self.cache.get, doi)
+        if cached is not None:
+            return cached
+        session = self._get_session()
+        # Concurrent batch entries that share a DOI wait on the same request.
+        task = self._inflight.get(doi)
+        if task is None:
+            task = asyncio.ensure_future(self._request(session, doi))
+            self._inflight[doi] = task
+            task.add_done_callback(lambda _: self._inflight.pop(doi, None))
+        message = await asyncio.shield(task)
+        await asyncio.to_thread(self.cache.put, doi, message)
+        return message
+
+    async def fetch_many(self, dois: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+        """Resolve several DOIs with one filter query per CROSSREF_BULK_SIZE chunk.
+
+        Chunks are requested concurrently. Best effort: DOIs missing from the
+        response, or from a failed request, are absent from the result so
+        callers can fall back to fetch_metadata.
+        """
+
+        found, chunks = await asyncio.to_thread(split_cached, self.cache, dois)
+        if not chunks:
+            return found
+        session = self._get_session()
+        fetched: Dict[str, Dict[str, Any]] = {}
+        for chunk_found in await asyncio.gather(*(self._request_many(session, chunk) for chunk in chunks)):
+            fetched.update(chunk_found)
+        if fetched:
+            await asyncio.to_thread(self._cache_many, fetched)
+            found.update(fetched)
+        return found
+
+    def _cache_many(self, messages: Dict[str, Dict[str, Any]]) -> None:
+        for doi, message in messages.items():
+            self.cache.put(doi, message)
+
+    async def _request_many(self, session: aiohttp.ClientSession, chunk: List[str]) -> Dict[str, Dict[str, Any]]:
+        try:
+            async with session.get(self.base_url, params=bulk_filter_params(chunk)) as resp:
+                resp.raise_for_status()
+                payload = orjson.loads(await resp.read())
+        except (aiohttp.ClientError, asyncio.TimeoutError, ValueError) as exc:
+            logger.warning("Crossref bulk lookup failed for %s DOIs: %s", len(chunk), exc)
+            return {}
+        return index_bulk_items(payload, chunk)
+
+    async def _request(self, session: aiohttp.ClientSession, doi: str) -> Dict[str, Any]:
+        url = f"{self.base_url}/{doi}"
+        for attempt in range(self.max_retries + 1):
+            try:
+                async with session.get(url) as resp:
+                    status = resp.status
+                    payload = orjson.loads(await resp.read()) if status < 400 else None
+            except (aiohttp.ClientError, asyncio.TimeoutError) as exc:
+                logger.warning("Crossref request failed (%s/%s): %s", attempt + 1, self.max_retries + 1, exc)
+                if attempt == self.max_retries:
+                    raise MetaError(
+                        MetaErrorCode.CROSSREF_REQUEST_FAILED,
+                        f"Crossref request failed for DOI {doi}: {exc}",
+                    ) from exc
+                await asyncio.sleep(self.backoff ** attempt)
+                continue
+
+            if status == 404:
+                raise MetaError(MetaErrorCode.CROSSREF_NOT_FOUND, f"Crossref could not find DOI {doi}")
+            if status == 429:
+                logger.warning("Crossref rate limit encountered for %s (%s/%s)", doi, attempt + 1, self.max_retries + 1)
+                if attempt == self.max_retries:
+                    raise MetaError(
+                        MetaErrorCode.CROSSREF_RATE_LIMIT,
+                        "Crossref rate limit reached. Try again shortly.",
+                    )
+                await asyncio.sleep(self.backoff ** (attempt + 1))
+                continue
+            if 500 <= status < 600:
+                logger.warning(
+                    "Crossref server error %s for %s (%s/%s)",
+                    status,
+                    doi,
+                    attempt + 1,
+                    self.max_retries + 1,
+                )
+                if attempt == self.max_retries:
+                    raise MetaError(
+                        MetaErrorCode.CROSSREF_SERVER_ERROR,
+                        f"Crossref temporary error ({status}) for DOI {doi}",
+                    )
+                await asyncio.sleep(self.backoff ** (attempt + 1))
+                continue
+            if payload is None:
+                raise MetaError(
+                    MetaErrorCode.CROSSREF_REQUEST_FAILED,
+                    f"Crossref request error ({status}) for DOI {doi}",
+                )
+
+            return payload.get("message", {})
+
+        raise MetaError(
+            MetaErrorCode.CROSSREF_REQUEST_FAILED,
+            f"Crossref request failed for DOI {doi}",
+        )
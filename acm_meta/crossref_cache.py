@@ -0,0 +1,108 @@
+"""SQLite-backed Crossref cache so reruns skip DOIs fetched earlier."""
+
+from __future__ import annotations
+
+import logging
+import sqlite3
+import threading
+import time
+import zlib
+from pathlib import Path
+from typing import Any, Dict, Iterable, Optional
+
+import orjson
+
+from .settings import CROSSREF_CACHE_PATH, CROSSREF_CACHE_TTL_SECONDS
+
+
+logger = logging.getLogger(__name__)
+
+
+class CrossrefDiskCache:
+    def __init__(
+        self,
+        path: Path = CROSSREF_CACHE_PATH,
+        *,
+        ttl_seconds: int = CROSSREF_CACHE_TTL_SECONDS,
+    ) -> None:
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(str(self.path), check_same_thread=False)
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS works (doi TEXT PRIMARY KEY, payload BLOB, fetched_at INTEGER)"
+            )
+            conn.commit()
+            self._conn = conn
+        return self._conn
+
+    def get(self, doi: str) -> Optional[Dict[str, Any]]:
+        try:
+            with self._lock:
+                row = self._connect().execute(
+                    "SELECT payload, fetched_at FROM works WHERE doi = ?",
+                    (doi,),
+                ).fetchone()
+        except sqlite3.Error as exc:
+            logger.warning("Crossref cache lookup failed for %s: %s", doi, exc)
+            return None
+        if row is None:
+            return None
+        return self._decode(doi, row[0], row[1], time.time())
+
+    def get_many(self, dois: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+        """Look up several DOIs with one query per 500 keys; misses are omitted."""
+
+        dois = list(dois)
+        found: Dict[str, Dict[str, Any]] = {}
+        now = time.time()
+        for start in range(0, len(dois), 500):
+            chunk = dois[start : start + 500]
+            placeholders = ",".join("?" * len(chunk))
+            try:
+                with self._lock:
+                    rows = self._connect().execute(
+                        f"SELECT doi, payload, fetched_at FROM works WHERE doi IN ({placeholders})",
+                        chunk,
+                    ).fetchall()
+            except sqlite3.Error as exc:
+                logger.warning("Crossref cache lookup failed for %s DOIs: %s", len(chunk), exc)
+                continue
+            for doi, payload, fetched_at in rows:
+                message = self._decode(doi, payload, fetched_at, now)
+                if message is not None:
+                    found[doi] = message
+        return found
+
+    def _decode(self, doi: str, payload: bytes, fetched_at: int, now: float) -> Optional[Dict[str, Any]]:
+        if now - fetched_at >= self.ttl_seconds:
+            return None
+        try:
+            return orjson.loads(zlib.decompress(payload))
+        except (zlib.error, ValueError):
+            logger.warning("Discarding unreadable Crossref cache entry for %s", doi)
+            return None
+
+    def put(self, doi: str, message: Dict[str, Any]) -> None:
+        payload = zlib.compress(orjson.dumps(message, option=orjson.OPT_NON_STR_KEYS))
+        try:
+            with self._lock:
+                conn = self._connect()
+                conn.execute(
+                    "INSERT OR REPLACE INTO works (doi, payload, fetched_at) VALUES (?, ?, ?)",
+                    (doi, payload, int(time.time())),
+                )
+                conn.commit()
+        except sqlite3.Error as exc:
+            logger.warning("Failed to cache Crossref response for %s: %s", doi, exc)
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
@@ -4,17 +4,129 @@ from __future__ import annotations
 
 import logging
 import os
-import time
-from typing import Any, Dict
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, List, Optional
 
+import orjson
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
+from .crossref_cache import CrossrefDiskCache
 from .errors import MetaError, MetaErrorCode
+from .settings import CROSSREF_BULK_SIZE
 
 
 logger = logging.getLogger(__name__)
 
 
+def normalize_doi(doi: str) -> str:
+    return (doi or "").strip().lower()
+
+
+_DEFAULT_MAILTO = "nobody@example.com"
+_warned_default_mailto = False
+
+
+def polite_headers(mailto: str | None) -> tuple[str, Dict[str, str]]:
+    """Resolve the contact address and the User-Agent Crossref's polite pool expects."""
+
+    global _warned_default_mailto
+    mailto = mailto or os.getenv("CROSSREF_MAILTO") or _DEFAULT_MAILTO
+    if mailto == _DEFAULT_MAILTO and not _warned_default_mailto:
+        _warned_default_mailto = True
+        logger.warning("CROSSREF_MAILTO is not set; Crossref may route requests to the slower public pool")
+    return mailto, {"User-Agent": f"acm-meta-mvp/0.2.1 (mailto:{mailto})"}
+
+
+def bulk_filter_params(dois: Iterable[str]) -> Dict[str, str]:
+    dois = list(dois)
+    return {"filter": ",".join(f"doi:{doi}" for doi in dois), "rows": str(len(dois))}
+
+
+def index_bulk_items(payload: Dict[str, Any], requested: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+    wanted = set(requested)
+    found: Dict[str, Dict[str, Any]] = {}
+    for item in (payload.get("message") or {}).get("items") or []:
+        doi = normalize_doi(item.get("DOI", ""))
+        if doi in wanted:
+            found[doi] = item
+    return found
+
+
+def split_cached(cache: "MetadataCache", dois: Iterable[str]) -> tuple[Dict[str, Dict[str, Any]], List[List[str]]]:
+    """Return cached messages plus CROSSREF_BULK_SIZE chunks of DOIs still to fetch.
+
+    DOIs containing commas cannot be expressed in a filter query and are left
+    for the per-DOI lookup.
+    """
+
+    wanted = [doi for doi in dict.fromkeys(normalize_doi(doi) for doi in dois) if doi and "," not in doi]
+    found = cache.get_many(wanted)
+    pending = [doi for doi in wanted if doi not in found]
+    chunks = [pending[i : i + CROSSREF_BULK_SIZE] for i in range(0, len(pending), CROSSREF_BULK_SIZE)]
+    return found, chunks
+
+
+class MetadataCache:
+    """Thread-safe LRU of Crossref messages keyed by normalized DOI.
+
+    Misses fall through to the optional on-disk tier before hitting the
+    network. Only successful lookups are stored; errors (404/429/5xx) always
+    re-raise so a later attempt can still succeed.
+    """
+
+    def __init__(self, maxsize: int = 4096, *, disk: Optional[CrossrefDiskCache] = None) -> None:
+        self.maxsize = maxsize
+        self.disk = disk
+        self._entries: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, doi: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            message = self._entries.get(doi)
+            if message is not None:
+                self._entries.move_to_end(doi)
+                return message
+        if self.disk is None:
+            return None
+        message = self.disk.get(doi)
+        if message is not None:
+            self._remember(doi, message)
+        return message
+
+    def get_many(self, dois: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+        found: Dict[str, Dict[str, Any]] = {}
+        missing: List[str] = []
+        with self._lock:
+            for doi in dois:
+                message = self._entries.get(doi)
+                if message is not None:
+                    self._entries.move_to_end(doi)
+                    found[doi] = message
+                else:
+                    missing.append(doi)
+        if missing and self.disk is not None:
+            # One IN (...) query instead of a round trip per DOI.
+            for doi, message in self.disk.get_many(missing).items():
+                self._remember(doi, message)
+                found[doi] = message
+        return found
+
+    def put(self, doi: str, message: Dict[str, Any]) -> None:
+        self._remember(doi, message)
+        if self.disk is not None:
+            self.disk.put(doi, message)
+
+    def _remember(self, doi: str, message: Dict[str, Any]) -> None:
+        with self._lock:
+            self._entries[doi] = message
+            self._entries.move_to_end(doi)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+
 class CrossrefClient:
     def __init__(
         self,
@@ -23,69 +135,72 @@ class CrossrefClient:
         timeout: float = 15,
         max_retries: int = 2,
         backoff: float = 1.5,
+        cache: Optional[MetadataCache] = None,
     ) -> None:
         self.base_url = "https://api.crossref.org/works"
         self.timeout = timeout
         self.max_retries = max_retries
         self.backoff = backoff
-        contact = mailto or os.getenv("CROSSREF_MAILTO", "nobody@example.com")
-        self.headers = {"User-Agent": f"acm-meta-mvp/0.2.1 (mailto:{contact})"}
+        self.mailto, self.headers = polite_headers(mailto)
+        self.cache = cache if cache is not None else MetadataCache(disk=CrossrefDiskCache())
         self.session = requests.Session()
+        self.session.headers.update(self.headers)
+        retry = Retry(
+            total=self.max_retries,
+            backoff_factor=self.backoff,
+            status_forcelist=[429, 500, 502, 503, 504],
+            allowed_methods=frozenset(["GET"]),
+            respect_retry_after_header=True,
+            raise_on_status=False,
+        )
+        # Every lookup hits api.crossref.org, so a single pool with room for
+        # concurrent callers keeps TLS connections warm across fetches.
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=32, pool_block=False, max_retries=retry)
+        self.session.mount("https://", adapter)
 
     def fetch_metadata(self, doi: str) -> Dict[str, Any]:
+        doi = normalize_doi(doi)
+        cached = self.cache.get(doi)
+        if cached is not None:
+            return cached
+        message = self._request(doi)
+        self.cache.put(doi, message)
+        return message
+
+    def _request(self, doi: str) -> Dict[str, Any]:
         url = f"{self.base_url}/{doi}"
-        for attempt in range(self.max_retries + 1):
-            try:
-                resp = self.session.get(url, headers=self.headers, timeout=self.timeout)
-            except requests.RequestException as exc:
-                logger.warning("Crossref request failed (%s/%s): %s", attempt + 1, self.max_retries + 1, exc)
-                if attempt == self.max_retries:
-                    raise MetaError(
-                        MetaErrorCode.CROSSREF_REQUEST_FAILED,
-                        f"Crossref request failed for DOI {doi}: {exc}",
-                    ) from exc
-                time.sleep(self.backoff ** attempt)
-                continue
-
-            if resp.status_code == 404:
-                raise MetaError(MetaErrorCode.CROSSREF_NOT_FOUND, f"Crossref could not find DOI {doi}")
-            if resp.status_code == 429:
-                logger.warning("Crossref rate limit encountered for %s (%s/%s)", doi, attempt + 1, self.max_retries + 1)
-                if attempt == self.max_retries:
-                    raise MetaError(
-                        MetaErrorCode.CROSSREF_RATE_LIMIT,
-                        "Crossref rate limit reached. Try again shortly.",
-                    )
-                time.sleep(self.backoff ** (attempt + 1))
-                continue
-            if 500 <= resp.status_code < 600:
-                logger.warning(
-                    "Crossref server error %s for %s (%s/%s)",
-                    resp.status_code,
-                    doi,
-                    attempt + 1,
-                    self.max_retries + 1,
-                )
-                if attempt == self.max_retries:
-                    raise MetaError(
-                        MetaErrorCode.CROSSREF_SERVER_ERROR,
-                        f"Crossref temporary error ({resp.status_code}) for DOI {doi}",
-                    )
-                time.sleep(self.backoff ** (attempt + 1))
-                continue
-
-            try:
-                resp.raise_for_status()
-            except requests.HTTPError as exc:  # pragma: no cover - requests internals
-                raise MetaError(
-                    MetaErrorCode.CROSSREF_REQUEST_FAILED,
-                    f"Crossref request error ({resp.status_code}) for DOI {doi}",
-                ) from exc
-
-            payload = resp.json()
-            return payload.get("message", {})
-
-        raise MetaError(
-            MetaErrorCode.CROSSREF_REQUEST_FAILED,
-            f"Crossref request failed for DOI {doi}",
-        )
+        try:
+            resp = self.session.get(url, timeout=self.timeout)
+        except requests.RequestException as exc:
+            logger.warning("Crossref request failed for %s: %s", doi, exc)
+            raise MetaError(
+                MetaErrorCode.CROSSREF_REQUEST_FAILED,
+                f"Crossref request failed for DOI {doi}: {exc}",
+            ) from exc
+
+        # urllib3 has already retried 429/5xx; whatever status is left is final.
+        if resp.status_code == 404:
+            raise MetaError(MetaErrorCode.CROSSREF_NOT_FOUND, f"Crossref could not find DOI {doi}")
+        if resp.status_code == 429:
+            logger.warning("Crossref rate limit encountered for %s", doi)
+            raise MetaError(
+                MetaErrorCode.CROSSREF_RATE_LIMIT,
+                "Crossref rate limit reached. Try again shortly.",
+            )
+        if 500 <= resp.status_code < 600:
+            logger.warning("Crossref server error %s for %s", resp.status_code, doi)
+            raise MetaError(
+                MetaErrorCode.CROSSREF_SERVER_ERROR,
+                f"Crossref temporary error ({resp.status_code}) for DOI {doi}",
+            )
+
+        try:
+            resp.raise_for_status()
+        except requests.HTTPError as exc:  # pragma: no cover - requests internals
+            raise MetaError(
+                MetaErrorCode.CROSSREF_REQUEST_FAILED,
+                f"Crossref request error ({resp.status_code}) for DOI {doi}",
+            ) from exc
+
+        payload = orjson.loads(resp.content)
+        return payload.get("message", {})
@@ -24,3 +24,7 @@ class MetaError(Exception):
         super().__init__(message)
         self.code = code
         self.message = message
+
+    def __reduce__(self):
+        # Keep the (code, message) signature intact when crossing process pools.
+        return (type(self), (self.code, self.message))
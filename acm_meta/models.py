@@ -2,16 +2,17 @@
 
 from __future__ import annotations
 
-from datetime import datetime
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
 from typing import Any, Dict, Literal, Optional
 
-try:  # Support both Pydantic v1 and v2
-    from pydantic import BaseModel, Field, ConfigDict
-except ImportError:  # pragma: no cover - fallback for old versions
-    from pydantic import BaseModel, Field  # type: ignore[misc]
-    ConfigDict = None  # type: ignore[assignment]
 
-from .settings import CSV_COLUMNS
+def format_timestamp(value: datetime) -> str:
+    """Render a UTC timestamp as ``YYYY-MM-DDTHH:MM:SSZ`` (naive values are assumed UTC)."""
+
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value.replace(microsecond=0).isoformat() + "Z"
 
 
 def generate_record_id(doi: str, file_name: str) -> str:
@@ -21,40 +22,55 @@ def generate_record_id(doi: str, file_name: str) -> str:
     return f"file:{(file_name or '').strip().lower()}"
 
 
-class PaperRecord(BaseModel):
+def _utc_now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+# Plain slotted dataclasses: records are built once per paper and read many
+# times, so skipping per-field validation matters more than coercion. Request
+# bodies are still validated by the Pydantic payload models in main.py.
+@dataclass(slots=True)
+class PaperRecord:
     id: str
-    title: str = Field("", alias="Title")
-    venue: str = Field("", alias="Venue")
-    publication_year: Optional[int] = Field(None, alias="Publication year")
-    author_list: str = Field("", alias="Author list")
-    abstract: str = Field("", alias="Abstract")
-    doi: str = Field("", alias="DOI")
-    file_name: str
+    title: str = ""
+    venue: str = ""
+    publication_year: Optional[int] = None
+    author_list: str = ""
+    abstract: str = ""
+    doi: str = ""
+    file_name: str = ""
     source_url: str = ""
-    saved_at: datetime
-
-    if ConfigDict:
-        model_config = ConfigDict(populate_by_name=True)
-    else:  # pragma: no cover - Pydantic v1
-        class Config:
-            allow_population_by_field_name = True
+    saved_at: datetime = field(default_factory=_utc_now)
+    _legacy: Optional[Dict[str, Any]] = field(default=None, init=False, repr=False, compare=False)
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        object.__setattr__(self, name, value)
+        if name != "_legacy":
+            object.__setattr__(self, "_legacy", None)
+
+    @property
+    def legacy(self) -> Dict[str, Any]:
+        """Cached legacy mapping; treat as read-only and use to_legacy_dict() to edit."""
+
+        if self._legacy is None:
+            self._legacy = {
+                "Title": self.title,
+                "Venue": self.venue,
+                "Publication year": self.publication_year or "",
+                "Author list": self.author_list,
+                "Abstract": self.abstract,
+                "DOI": self.doi,
+                "file_name": self.file_name,
+                "source_url": self.source_url,
+                "saved_at": format_timestamp(self.saved_at),
+                "id": self.id,
+            }
+        return self._legacy
 
     def to_legacy_dict(self) -> Dict[str, Any]:
         """Map to the CSV/JSON schema expected by older clients."""
 
-        legacy = {
-            "Title": self.title,
-            "Venue": self.venue,
-            "Publication year": self.publication_year or "",
-            "Author list": self.author_list,
-            "Abstract": self.abstract,
-            "DOI": self.doi,
-            "file_name": self.file_name,
-            "source_url": self.source_url,
-            "saved_at": self.saved_at.replace(microsecond=0).isoformat() + "Z",
-            "id": self.id,
-        }
-        return legacy
+        return dict(self.legacy)
 
     @classmethod
     def from_legacy_dict(cls, data: Dict[str, Any]) -> "PaperRecord":
@@ -67,30 +83,34 @@ class PaperRecord(BaseModel):
             publication_year = None
 
         saved_at_raw = str(data.get("saved_at") or "")
-        saved_at = datetime.utcnow()
+        saved_at = datetime.now(timezone.utc)
         if saved_at_raw:
             try:
                 saved_at = datetime.fromisoformat(saved_at_raw.rstrip("Z"))
             except ValueError:
-                saved_at = datetime.utcnow()
+                pass
+            else:
+                if saved_at.tzinfo is None:
+                    saved_at = saved_at.replace(tzinfo=timezone.utc)
 
         record_id = data.get("id") or generate_record_id(data.get("DOI", ""), data.get("file_name", ""))
 
         return cls(
             id=record_id,
-            title=data.get("Title", ""),
-            venue=data.get("Venue", ""),
+            title=data.get("Title") or "",
+            venue=data.get("Venue") or "",
             publication_year=publication_year,
-            author_list=data.get("Author list", ""),
-            abstract=data.get("Abstract", ""),
-            doi=data.get("DOI", ""),
-            file_name=data.get("file_name", data.get("Title", "")),
-            source_url=data.get("source_url", ""),
+            author_list=data.get("Author list") or "",
+            abstract=data.get("Abstract") or "",
+            doi=data.get("DOI") or "",
+            file_name=data.get("file_name", data.get("Title")) or "",
+            source_url=data.get("source_url") or "",
             saved_at=saved_at,
         )
 
 
-class UploadResponseItem(BaseModel):
+@dataclass(slots=True)
+class UploadResponseItem:
     file_name: str
     status: Literal["ok", "error"]
     record: Optional[Dict[str, Any]] = None
@@ -106,16 +126,14 @@ class UploadResponseItem(BaseModel):
         return cls(file_name=file_name, status="error", message=message, error_code=code)
 
     def to_payload(self) -> Dict[str, Any]:
-        try:  # Pydantic v2
-            return self.model_dump()
-        except AttributeError:  # pragma: no cover - compatibility path for v1
-            return self.dict()
-
-
-def rows_from_records(records: list[PaperRecord]) -> list[Dict[str, Any]]:
-    """Return sheet rows for CSV/JSON export."""
-
-    return [{column: record.to_legacy_dict().get(column, "") for column in CSV_COLUMNS} for record in records]
+        # Built by hand: asdict() would deep-copy the already plain record dict.
+        return {
+            "file_name": self.file_name,
+            "status": self.status,
+            "record": self.record,
+            "message": self.message,
+            "error_code": self.error_code,
+        }
 
 
 EDITABLE_COLUMNS = [
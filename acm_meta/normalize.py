@@ -3,23 +3,19 @@
 from __future__ import annotations
 
 import re
-from datetime import datetime
+from datetime import datetime, timezone
 from pathlib import Path
 from typing import Any, Dict, List, Optional, Tuple
 
-from .models import PaperRecord, generate_record_id
-from .pdf_io import extract_abstract_from_pdf
+from .models import PaperRecord, format_timestamp, generate_record_id
+from .pdf_io import extract_abstract_from_context, extract_abstract_from_pdf
 
 
-def strip_tags(text: str) -> str:
-    return re.sub(r"<[^>]+>", "", text).strip()
+_TAGS_RE = re.compile(r"<[^>]+>")
 
 
-def _normalize_author(author: Dict[str, Any]) -> str:
-    given = author.get("given") or ""
-    family = author.get("family") or ""
-    full = " ".join(part for part in [given, family] if part)
-    return full.strip()
+def strip_tags(text: str) -> str:
+    return _TAGS_RE.sub("", text).strip()
 
 
 def _coerce_year(value: Any) -> Optional[int]:
@@ -41,15 +37,17 @@ def normalize_metadata(
     file_name: str,
     doi_fallback: Optional[str],
     pdf_path: Optional[Path] = None,
+    pdf_context: Optional[Dict[str, Any]] = None,
+    saved_at: Optional[datetime] = None,
 ) -> Tuple[PaperRecord, Dict[str, Any]]:
     title_list = message.get("title") or []
     title = title_list[0] if title_list else ""
 
-    authors: List[str] = []
-    for author in message.get("author", []):
-        full = _normalize_author(author)
-        if full:
-            authors.append(full)
+    authors: List[str] = [
+        f"{author.get('given') or ''} {author.get('family') or ''}".strip()
+        for author in message.get("author", [])
+    ]
+    authors = [name for name in authors if name]
     author_list_str = ", ".join(authors)
 
     issued = message.get("issued", {}).get("date-parts", [[None]])
@@ -63,10 +61,12 @@ def normalize_metadata(
 
     abstract_raw = message.get("abstract")
     abstract = strip_tags(abstract_raw) if isinstance(abstract_raw, str) else ""
-    if not abstract and pdf_path is not None and pdf_path.exists():
+    if not abstract and pdf_context is not None:
+        abstract = extract_abstract_from_context(pdf_context)
+    elif not abstract and pdf_path is not None and pdf_path.exists():
         abstract = extract_abstract_from_pdf(pdf_path)
 
-    saved_at = datetime.utcnow()
+    saved_at = saved_at or datetime.now(timezone.utc)
     record = PaperRecord(
         id=generate_record_id(doi, file_name),
         title=title,
@@ -91,7 +91,7 @@ def normalize_metadata(
         "source_url": message.get("URL", ""),
         "raw_crossref": message,
         "record_id": record.id,
-        "saved_at": saved_at.isoformat() + "Z",
+        "saved_at": format_timestamp(saved_at),
     }
 
     return record, full
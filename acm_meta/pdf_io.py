@@ -3,101 +3,198 @@
 from __future__ import annotations
 
 import logging
+import mmap
 import re
+import string
 from pathlib import Path
-from typing import List
-
-import fitz
-from pypdf import PdfReader
-
-try:  # pypdf < 3 does not expose PdfReadError centrally
-    from pypdf.errors import PdfReadError  # type: ignore
-except Exception:  # pragma: no cover - fallback for older versions
-    class PdfReadError(Exception):
-        """Raised when a PDF cannot be parsed."""
+from typing import TYPE_CHECKING, Any, Dict, List, Optional
 
 from .errors import MetaError, MetaErrorCode
 
 
 DOI_RE = re.compile(r"\b10\.\d{4,9}/[^\s\"<>]+\b")
+# DOI of the document itself as declared in its (normally uncompressed) XMP packet.
+_XMP_DOI_RE = re.compile(
+    rb"(?i)(?:prism:doi|pdfx:doi|crossmark:doi)\s*(?:>|=\s*[\"'])\s*(?:doi:)?(10\.\d{4,9}/[^\s\"'<>]+)"
+)
+_SNIFF_BYTES = 256 * 1024
+_ABSTRACT_LEAD_CHARS = frozenset(":- \t\n\r\f\v")
+_ABSTRACT_STOPS = ("keywords", "index terms", "ccs concepts", "author keywords", "introduction", "1.", "i.")
+# ASCII-only lowering keeps offsets aligned with the original text (str.lower can change lengths).
+_ASCII_LOWER = str.maketrans(string.ascii_uppercase, string.ascii_lowercase)
+_STOP_RE = re.compile(r"^(keywords|index terms|ccs concepts|author keywords|introduction|1\.\s)")
+_LEAD_ABSTRACT_RE = re.compile(r"^abstract[:\s-]*", re.IGNORECASE)
 logger = logging.getLogger(__name__)
 
+if TYPE_CHECKING:
+    import fitz
+
 
 def _normalize_text(text: str) -> str:
-    return re.sub(r"\s+", " ", text or "").strip()
+    # str.split() uses the same str.isspace() notion of whitespace as \s+.
+    return " ".join((text or "").split())
 
 
-def extract_doi_candidates(pdf_path: Path, max_pages: int = 2) -> List[str]:
+def _open_document(pdf_path: Path) -> "fitz.Document":
+    # Deferred so API routes that never touch a PDF do not pay for loading MuPDF.
+    import fitz
+
     try:
-        reader = PdfReader(str(pdf_path))
-    except (PdfReadError, OSError, ValueError) as exc:
+        return fitz.open(pdf_path)
+    except Exception as exc:  # PyMuPDF raises a variety of internal errors
         raise MetaError(MetaErrorCode.PDF_PARSE_FAILED, f"Failed to read {pdf_path.name}: {exc}") from exc
-    text = ""
-    for page in reader.pages[:max_pages]:
-        text += page.extract_text() or ""
-    candidates = []
-    for match in DOI_RE.findall(text):
-        cleaned = match.strip().rstrip(".,;")
-        lowered = cleaned.lower()
-        if lowered not in candidates:
-            candidates.append(lowered)
-    return candidates
 
 
-def extract_abstract_from_pdf(pdf_path: Path, max_pages: int = 2) -> str:
-    try:
-        doc = fitz.open(pdf_path)
-    except Exception as exc:  # pragma: no cover - PyMuPDF internals
-        logger.warning("Failed to open PDF %s for abstract extraction: %s", pdf_path.name, exc)
-        return ""
+def open_pdf_context(pdf_path: Path, max_pages: int = 2) -> Dict[str, Any]:
+    """Parse the first pages once and return the text and layout blocks.
+
+    The result feeds both DOI detection and the abstract fallback so each
+    PDF is only opened a single time per pipeline run. Every page up to
+    ``max_pages`` is read even once a DOI turns up: an abstract may run onto
+    page two, and page-two DOIs remain candidates if page-one ones fail.
+    """
 
+    import fitz
+
+    doc = _open_document(pdf_path)
     try:
         text_buffer: List[str] = []
+        # One TextPage per page: the text and block extractions share a single
+        # MuPDF layout pass instead of rebuilding it for each get_text call.
+        pages: List[Any] = []
         for page_index in range(min(max_pages, len(doc))):
             page = doc.load_page(page_index)
-            text_buffer.append(page.get_text("text"))
-        raw_text = "\n".join(text_buffer)
+            # get_text ignores its own default flags when handed a TextPage, so
+            # build it with them (TEXTFLAGS_TEXT == TEXTFLAGS_BLOCKS).
+            textpage = page.get_textpage(flags=fitz.TEXTFLAGS_TEXT)
+            pages.append((page, textpage))
+            page_text = page.get_text("text", textpage=textpage)
+            text_buffer.append(page_text)
+        text = "\n".join(text_buffer)
+        blocks: List[List[Any]] = []
+        # Layout blocks only serve the abstract fallback, which the text scan
+        # pre-empts whenever an "abstract" label is present; skip them then.
+        if "abstract" not in text.translate(_ASCII_LOWER):
+            for page, textpage in pages:
+                page_blocks = page.get_text("blocks", textpage=textpage)
+                page_blocks.sort(key=lambda b: (round(b[1], 1), round(b[0], 1)))
+                blocks.append(page_blocks)
     finally:
         doc.close()
 
-    normalized = raw_text.replace("\r", "\n")
-    pattern = re.compile(
-        r"(?is)abstract[:\s-]*\n?(.*?)(?:\n\s*(keywords|index terms|ccs concepts|author keywords|introduction|1\.|i\.)|\Z)"
-    )
-    match = pattern.search(normalized)
-    if match:
-        return _normalize_text(match.group(1))
+    return {"text": text, "blocks": blocks}
+
+
+def _slice_abstract(text: str) -> Optional[str]:
+    """Return the text between the first "abstract" label and the next section header.
+
+    Same result as the old lazy ``abstract...(keywords|introduction|...)``
+    regex, but built on str.find so long first pages cannot backtrack.
+    """
+
+    lowered = text.translate(_ASCII_LOWER)
+    start = lowered.find("abstract")
+    if start == -1:
+        return None
+    length = len(lowered)
+    body_start = start + len("abstract")
+    while body_start < length and lowered[body_start] in _ABSTRACT_LEAD_CHARS:
+        body_start += 1
+
+    end = length
+    newline = lowered.find("\n", body_start)
+    while newline != -1:
+        probe = newline + 1
+        while probe < length and lowered[probe].isspace():
+            probe += 1
+        if lowered.startswith(_ABSTRACT_STOPS, probe):
+            end = newline
+            break
+        newline = lowered.find("\n", newline + 1)
+    return text[body_start:end]
+
+
+def extract_doi_candidates_from_text(text: str) -> List[str]:
+    if "10." not in text:
+        return []
+    candidates: List[str] = []
+    seen: set[str] = set()
+    for match in DOI_RE.finditer(text):
+        lowered = match.group(0).strip().rstrip(".,;").lower()
+        if lowered not in seen:
+            seen.add(lowered)
+            candidates.append(lowered)
+    return candidates
+
+
+def sniff_doi_candidates(pdf_path: Path, head_bytes: int = _SNIFF_BYTES) -> List[str]:
+    """Look for the XMP-declared DOI in the raw head of the file without parsing it.
+
+    Page content streams are compressed, so only metadata is visible here; an
+    empty result just means the caller should fall back to text extraction.
+    """
 
-    # Fallback to block parsing if regex fails
     try:
-        doc = fitz.open(pdf_path)
-    except Exception as exc:  # pragma: no cover - PyMuPDF internals
-        logger.warning("Failed to reopen PDF %s for block parsing: %s", pdf_path.name, exc)
-        return ""
+        with pdf_path.open("rb") as handle, mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ) as view:
+            head = view[:head_bytes]
+    except (OSError, ValueError):  # ValueError: empty file cannot be mapped
+        return []
+    candidates: List[str] = []
+    for match in _XMP_DOI_RE.finditer(head):
+        doi = match.group(1).decode("latin-1").rstrip(".,;").lower()
+        if doi not in candidates:
+            candidates.append(doi)
+    return candidates
 
-    abstract_chunks: List[str] = []
-    target_found = False
+
+def extract_doi_candidates(pdf_path: Path, max_pages: int = 2) -> List[str]:
+    sniffed = sniff_doi_candidates(pdf_path)
+    if sniffed:
+        return sniffed
+    doc = _open_document(pdf_path)
     try:
         for page_index in range(min(max_pages, len(doc))):
-            page = doc.load_page(page_index)
-            blocks = page.get_text("blocks")
-            blocks.sort(key=lambda b: (round(b[1], 1), round(b[0], 1)))
-            for block in blocks:
-                text = (block[4] or "").strip()
-                if not text:
-                    continue
-                lowered = text.lower()
-                if not target_found:
-                    if lowered.startswith("abstract"):
-                        cleaned = re.sub(r"^abstract[:\s-]*", "", text, flags=re.IGNORECASE).strip()
-                        if cleaned:
-                            abstract_chunks.append(cleaned)
-                        target_found = True
-                    continue
-                if re.match(r"^(keywords|index terms|ccs concepts|author keywords|introduction|1\.\s)", lowered):
-                    return _normalize_text(" ".join(abstract_chunks))
-                abstract_chunks.append(text)
+            candidates = extract_doi_candidates_from_text(doc.load_page(page_index).get_text("text"))
+            if candidates:
+                return candidates
     finally:
         doc.close()
+    return []
+
+
+def extract_abstract_from_context(context: Dict[str, Any]) -> str:
+    normalized = context["text"].replace("\r", "\n")
+    abstract = _slice_abstract(normalized)
+    if abstract is not None:
+        return _normalize_text(abstract)
+
+    # Fall back to layout blocks when the plain-text scan finds no label
+    abstract_chunks: List[str] = []
+    target_found = False
+    for page_blocks in context["blocks"]:
+        for block in page_blocks:
+            text = (block[4] or "").strip()
+            if not text:
+                continue
+            lowered = text.lower()
+            if not target_found:
+                if lowered.startswith("abstract"):
+                    cleaned = _LEAD_ABSTRACT_RE.sub("", text).strip()
+                    if cleaned:
+                        abstract_chunks.append(cleaned)
+                    target_found = True
+                continue
+            if _STOP_RE.match(lowered):
+                return _normalize_text(" ".join(abstract_chunks))
+            abstract_chunks.append(text)
 
     return _normalize_text(" ".join(abstract_chunks))
+
+
+def extract_abstract_from_pdf(pdf_path: Path, max_pages: int = 2) -> str:
+    try:
+        context = open_pdf_context(pdf_path, max_pages=max_pages)
+    except MetaError as exc:
+        logger.warning("Failed to open PDF %s for abstract extraction: %s", pdf_path.name, exc)
+        return ""
+    return extract_abstract_from_context(context)
@@ -3,31 +3,39 @@
 from __future__ import annotations
 
 import asyncio
-import json
 import logging
+import os
 import re
+from concurrent.futures import ProcessPoolExecutor
 from contextlib import suppress
+from datetime import datetime, timezone
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Sequence, Tuple
+from typing import Any, BinaryIO, Dict, List, Optional, Sequence, Tuple
 from uuid import uuid4
 
+import orjson
 from fastapi import UploadFile
 
+from .crossref_async import AsyncCrossrefClient
 from .crossref_client import CrossrefClient
 from .errors import MetaError, MetaErrorCode
 from .models import PaperRecord
 from .normalize import normalize_metadata
-from .pdf_io import extract_doi_candidates
+from .pdf_io import extract_doi_candidates_from_text, open_pdf_context, sniff_doi_candidates
 from .settings import (
     ALLOWED_UPLOAD_CONTENT_TYPES,
-    CSV_COLUMNS,
+    CROSSREF_BULK_SIZE,
+    CROSSREF_CONCURRENCY,
     MAX_UPLOAD_SIZE_BYTES,
     MAX_UPLOAD_SIZE_MB,
     OUT_DIR,
     PDF_DIR,
+    PDF_PARSE_WORKERS,
     UPLOAD_CHUNK_SIZE,
+    UPLOAD_CONCURRENCY,
+    ensure_dirs,
 )
-from .storage import RecordStore
+from .storage import RecordStore, write_records_csv
 
 
 logger = logging.getLogger(__name__)
@@ -48,15 +56,26 @@ def _sanitize_display_name(filename: Optional[str]) -> str:
     return sanitized[:120]
 
 
+def _claim_path(candidate: Path) -> bool:
+    # O_EXCL makes choosing and creating the file one step, so concurrent
+    # uploads with the same name can never share (and truncate) a path.
+    try:
+        fd = os.open(candidate, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o644)
+    except FileExistsError:
+        return False
+    os.close(fd)
+    return True
+
+
 def _allocate_storage_path(base_name: str) -> Path:
     target = PDF_DIR / base_name
-    if not target.exists():
+    if _claim_path(target):
         return target
     stem = Path(base_name).stem or "upload"
     suffix = Path(base_name).suffix or ".pdf"
     for _ in range(32):
         candidate = PDF_DIR / f"{stem}_{uuid4().hex[:8]}{suffix}"
-        if not candidate.exists():
+        if _claim_path(candidate):
             return candidate
     raise MetaError(MetaErrorCode.UNKNOWN_ERROR, "Unable to allocate storage for upload")
 
@@ -69,23 +88,32 @@ def _validate_upload(upload: UploadFile, display_name: str) -> None:
         raise MetaError(MetaErrorCode.INVALID_FILE_TYPE, "Only PDF uploads are supported")
 
 
-async def _write_upload_to_disk(upload: UploadFile, destination: Path) -> None:
+def _copy_upload(source: BinaryIO, destination: Path) -> int:
+    """Copy the spooled upload in 1MB chunks, stopping once the size limit is passed."""
+
     total_bytes = 0
+    with destination.open("wb") as buffer:
+        while chunk := source.read(UPLOAD_CHUNK_SIZE):
+            total_bytes += len(chunk)
+            if total_bytes > MAX_UPLOAD_SIZE_BYTES:
+                break
+            buffer.write(chunk)
+    return total_bytes
+
+
+async def _write_upload_to_disk(upload: UploadFile, destination: Path) -> None:
     try:
-        with destination.open("wb") as buffer:
-            while True:
-                chunk = await upload.read(UPLOAD_CHUNK_SIZE)
-                if not chunk:
-                    break
-                total_bytes += len(chunk)
-                if total_bytes > MAX_UPLOAD_SIZE_BYTES:
-                    with suppress(FileNotFoundError):
-                        destination.unlink()
-                    raise MetaError(
-                        MetaErrorCode.FILE_TOO_LARGE,
-                        f"PDF exceeds the {MAX_UPLOAD_SIZE_MB}MB upload limit",
-                    )
-                buffer.write(chunk)
+        # The whole copy runs in one worker thread instead of hopping threads
+        # for every chunk read from the spooled file and every chunk written.
+        await upload.seek(0)
+        total_bytes = await asyncio.to_thread(_copy_upload, upload.file, destination)
+        if total_bytes > MAX_UPLOAD_SIZE_BYTES:
+            with suppress(FileNotFoundError):
+                destination.unlink()
+            raise MetaError(
+                MetaErrorCode.FILE_TOO_LARGE,
+                f"PDF exceeds the {MAX_UPLOAD_SIZE_MB}MB upload limit",
+            )
         if total_bytes == 0:
             with suppress(FileNotFoundError):
                 destination.unlink()
@@ -94,84 +122,254 @@ async def _write_upload_to_disk(upload: UploadFile, destination: Path) -> None:
         await upload.close()
 
 
+def _parse_pdf(pdf_path: Path) -> Tuple[Dict[str, Any], List[str]]:
+    context = open_pdf_context(pdf_path)
+    return context, extract_doi_candidates_from_text(context["text"])
+
+
+def _scan_pdf(pdf_path: Path) -> Tuple[Optional[Dict[str, Any]], List[str]]:
+    """Return DOI candidates, parsing pages only when the XMP sniff finds nothing.
+
+    A ``None`` context means the PDF has not been parsed yet; the abstract
+    fallback and any retry with text candidates parse it on demand.
+    """
+
+    sniffed = sniff_doi_candidates(pdf_path)
+    if sniffed:
+        return None, sniffed
+    return _parse_pdf(pdf_path)
+
+
+def _remaining_candidates(pdf_path: Path, tried: List[str]) -> Tuple[Dict[str, Any], List[str]]:
+    context, candidates = _parse_pdf(pdf_path)
+    return context, [doi for doi in candidates if doi not in tried]
+
+
 class MetadataPipeline:
-    def __init__(self, store: RecordStore, client: CrossrefClient) -> None:
+    def __init__(
+        self,
+        store: RecordStore,
+        client: CrossrefClient,
+        async_client: Optional[AsyncCrossrefClient] = None,
+    ) -> None:
+        ensure_dirs()
         self.store = store
         self.client = client
+        self.async_client = async_client or AsyncCrossrefClient(
+            mailto=client.mailto,
+            timeout=client.timeout,
+            max_retries=client.max_retries,
+            backoff=client.backoff,
+            cache=client.cache,
+        )
+        self._semaphores: Dict[str, asyncio.Semaphore] = {}
+        self._semaphore_loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def _loop_semaphore(self, name: str, size: int) -> asyncio.Semaphore:
+        # Semaphores are shared by every upload served on the same loop and
+        # rebuilt when the loop changes (each asyncio.run gets a fresh one).
+        loop = asyncio.get_running_loop()
+        if self._semaphore_loop is not loop:
+            self._semaphores = {}
+            self._semaphore_loop = loop
+        semaphore = self._semaphores.get(name)
+        if semaphore is None:
+            semaphore = self._semaphores[name] = asyncio.Semaphore(size)
+        return semaphore
+
+    def _crossref_semaphore(self) -> asyncio.Semaphore:
+        return self._loop_semaphore("crossref", CROSSREF_CONCURRENCY)
 
-    def _process_pdf(self, pdf_path: Path, *, display_name: Optional[str] = None) -> Tuple[PaperRecord, Dict[str, Any]]:
-        candidates = extract_doi_candidates(pdf_path)
+    async def _resolve_async(
+        self,
+        pdf_path: Path,
+        parsed: Tuple[Optional[Dict[str, Any]], List[str]] | BaseException,
+        semaphore: asyncio.Semaphore,
+        *,
+        display_name: Optional[str] = None,
+        saved_at: Optional[datetime] = None,
+    ) -> Tuple[PaperRecord, Dict[str, Any]]:
+        if isinstance(parsed, BaseException):
+            raise parsed
+        context, candidates = parsed
         if not candidates:
             raise MetaError(MetaErrorCode.DOI_NOT_FOUND, f"DOI not found in {pdf_path.name}")
 
         last_error: MetaError | None = None
-        for doi in candidates:
-            try:
-                message = self.client.fetch_metadata(doi)
-                record, full = normalize_metadata(
-                    message,
+        tried: List[str] = []
+        while candidates:
+            for doi in candidates:
+                tried.append(doi)
+                try:
+                    async with semaphore:
+                        message = await self.async_client.fetch_metadata(doi)
+                except MetaError as exc:
+                    last_error = exc
+                    if exc.code not in {MetaErrorCode.CROSSREF_NOT_FOUND}:
+                        raise
+                    logger.info("Candidate DOI %s failed: %s", doi, exc)
+                    continue
+                kwargs = dict(
                     file_name=display_name or pdf_path.name,
                     doi_fallback=doi,
                     pdf_path=pdf_path,
+                    pdf_context=context,
+                    saved_at=saved_at,
                 )
-                return record, full
-            except MetaError as exc:
-                last_error = exc
-                if exc.code not in {MetaErrorCode.CROSSREF_NOT_FOUND}:
-                    raise
-                logger.info("Candidate DOI %s failed: %s", doi, exc)
-                continue
+                if context is None:
+                    # The abstract fallback may still need to parse the PDF.
+                    return await asyncio.to_thread(normalize_metadata, message, **kwargs)
+                return normalize_metadata(message, **kwargs)
+            if context is not None:
+                # Parsed candidates already cover every page that was read.
+                break
+            context, candidates = await asyncio.to_thread(_remaining_candidates, pdf_path, tried)
 
         raise last_error or MetaError(MetaErrorCode.DOI_NOT_FOUND, f"DOI not found in {pdf_path.name}")
 
-    def process_local_pdf(self, pdf_path: Path, *, display_name: Optional[str] = None) -> Tuple[PaperRecord, Dict[str, Any]]:
-        record, full = self._process_pdf(pdf_path, display_name=display_name)
+    def _persist(self, record: PaperRecord) -> None:
         existing = self.store.find_by_doi(record.doi)
         if existing:
             record.id = existing.id
         self.store.upsert(record)
         logger.info("Persisted record %s", record.id)
+
+    def process_local_pdf(self, pdf_path: Path, *, display_name: Optional[str] = None) -> Tuple[PaperRecord, Dict[str, Any]]:
+        """Resolve and persist one PDF from sync code, via the same path as uploads."""
+
+        async def _run() -> Tuple[PaperRecord, Dict[str, Any]]:
+            try:
+                parsed = await asyncio.to_thread(_scan_pdf, pdf_path)
+                return await self._resolve_async(
+                    pdf_path,
+                    parsed,
+                    self._crossref_semaphore(),
+                    display_name=display_name,
+                )
+            finally:
+                await self.async_client.close()
+
+        record, full = asyncio.run(_run())
+        self._persist(record)
         return record, full
 
     async def process_upload(self, upload: UploadFile) -> Tuple[PaperRecord, Dict[str, Any]]:
         display_name = _sanitize_display_name(upload.filename)
         _validate_upload(upload, display_name)
-        storage_path = _allocate_storage_path(display_name)
-
-        try:
-            await _write_upload_to_disk(upload, storage_path)
-            return await asyncio.to_thread(
-                self.process_local_pdf,
-                storage_path,
-                display_name=display_name,
-            )
-        except Exception:
-            with suppress(FileNotFoundError):
-                storage_path.unlink()
-            raise
+        # Caps how many uploads write, parse and resolve at once, however many
+        # requests or batch entries arrive together.
+        async with self._loop_semaphore("upload", UPLOAD_CONCURRENCY):
+            storage_path = _allocate_storage_path(display_name)
+            try:
+                await _write_upload_to_disk(upload, storage_path)
+                # Parsing runs in a worker thread; the Crossref lookup shares the
+                # async client's pool with every other in-flight upload.
+                parsed = await asyncio.to_thread(_scan_pdf, storage_path)
+                record, full = await self._resolve_async(
+                    storage_path,
+                    parsed,
+                    self._crossref_semaphore(),
+                    display_name=display_name,
+                )
+                # Persisting takes the store's file lock and appends to its log.
+                await asyncio.to_thread(self._persist, record)
+                return record, full
+            except Exception:
+                with suppress(FileNotFoundError):
+                    storage_path.unlink()
+                raise
 
-    def batch_process(self, pdf_dir: Path = PDF_DIR) -> List[Tuple[PaperRecord, Dict[str, Any]]]:
-        results: List[Tuple[PaperRecord, Dict[str, Any]]] = []
-        for pdf in sorted(pdf_dir.glob("*.pdf")):
-            logger.info("Processing %s", pdf.name)
+    async def _scan_and_prefetch(
+        self,
+        pdfs: List[Path],
+        executor: ProcessPoolExecutor,
+    ) -> List[Tuple[Optional[Dict[str, Any]], List[str]] | BaseException]:
+        """Parse PDFs in worker processes while bulk-fetching their leading DOIs.
+
+        Each CROSSREF_BULK_SIZE batch of leading DOIs is sent as soon as enough
+        PDFs have finished parsing, so network time overlaps the parse stage.
+        """
+
+        loop = asyncio.get_running_loop()
+
+        async def scan(index: int, pdf: Path):
             try:
-                results.append(self.process_local_pdf(pdf, display_name=pdf.name))
-            except MetaError as exc:
-                logger.error("Failed to process %s: %s", pdf.name, exc)
-            except Exception as exc:  # pragma: no cover - defensive logging
-                logger.exception("Unexpected failure while processing %s", pdf.name)
+                return index, await loop.run_in_executor(executor, _scan_pdf, pdf)
+            except Exception as exc:
+                return index, exc
+
+        parsed: List[Any] = [None] * len(pdfs)
+        prefetches: List[asyncio.Future] = []
+        leading: List[str] = []
+        seen: set[str] = set()
+        for next_done in asyncio.as_completed([scan(index, pdf) for index, pdf in enumerate(pdfs)]):
+            index, item = await next_done
+            parsed[index] = item
+            if not isinstance(item, BaseException) and item[1] and item[1][0] not in seen:
+                seen.add(item[1][0])
+                leading.append(item[1][0])
+            if len(leading) >= CROSSREF_BULK_SIZE:
+                prefetches.append(asyncio.ensure_future(self.async_client.fetch_many(leading)))
+                leading = []
+        if leading:
+            prefetches.append(asyncio.ensure_future(self.async_client.fetch_many(leading)))
+        await asyncio.gather(*prefetches)
+        return parsed
+
+    async def batch_process_async(self, pdf_dir: Path = PDF_DIR) -> List[Tuple[PaperRecord, Dict[str, Any]]]:
+        pdfs = sorted(pdf_dir.glob("*.pdf"))
+        if not pdfs:
+            return []
+        semaphore = asyncio.Semaphore(CROSSREF_CONCURRENCY)
+        saved_at = datetime.now(timezone.utc).replace(microsecond=0)
+        workers = min(PDF_PARSE_WORKERS, len(pdfs))
+        logger.info(
+            "Processing %s PDFs (%s parse workers, Crossref concurrency %s)",
+            len(pdfs),
+            workers,
+            CROSSREF_CONCURRENCY,
+        )
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            parsed = await self._scan_and_prefetch(pdfs, executor)
+
+        # Anything the bulk prefetch missed falls back to per-DOI lookups here.
+        outcomes = await asyncio.gather(
+            *(
+                self._resolve_async(pdf, item, semaphore, display_name=pdf.name, saved_at=saved_at)
+                for pdf, item in zip(pdfs, parsed)
+            ),
+            return_exceptions=True,
+        )
+
+        # Persist serially and in directory order so DOI dedupe stays deterministic.
+        results: List[Tuple[PaperRecord, Dict[str, Any]]] = []
+        for pdf, outcome in zip(pdfs, outcomes):
+            if isinstance(outcome, MetaError):
+                logger.error("Failed to process %s: %s", pdf.name, outcome)
+                continue
+            if isinstance(outcome, BaseException):  # pragma: no cover - defensive logging
+                logger.error("Unexpected failure while processing %s", pdf.name, exc_info=outcome)
+                continue
+            record, full = outcome
+            self._persist(record)
+            results.append((record, full))
         return results
 
+    def batch_process(self, pdf_dir: Path = PDF_DIR) -> List[Tuple[PaperRecord, Dict[str, Any]]]:
+        async def _run() -> List[Tuple[PaperRecord, Dict[str, Any]]]:
+            try:
+                return await self.batch_process_async(pdf_dir)
+            finally:
+                await self.async_client.close()
+
+        return asyncio.run(_run())
+
 
 def save_outputs(results: Sequence[Tuple[PaperRecord, Dict[str, Any]]]) -> None:
     json_data = [full for _, full in results]
     json_path = OUT_DIR / "metadata.json"
-    json_path.write_text(json.dumps(json_data, ensure_ascii=False, indent=2), encoding="utf-8")
-
-    sheet_rows = [record.to_legacy_dict() for record, _ in results]
-    df_path = OUT_DIR / "metadata_for_spreadsheet.csv"
-    import pandas as pd
+    json_path.write_bytes(orjson.dumps(json_data, option=orjson.OPT_INDENT_2, default=str))
 
-    df = pd.DataFrame(sheet_rows or [], columns=CSV_COLUMNS)
-    df.to_csv(df_path, index=False, encoding="utf-8-sig")
-    logger.info("Batch outputs written to %s and %s", json_path, df_path)
+    csv_path = OUT_DIR / "metadata_for_spreadsheet.csv"
+    write_records_csv(csv_path, [record for record, _ in results])
+    logger.info("Batch outputs written to %s and %s", json_path, csv_path)
@@ -3,6 +3,7 @@
 from __future__ import annotations
 
 import os
+from functools import lru_cache
 from pathlib import Path
 
 
@@ -13,14 +14,13 @@ STATIC_DIR = BASE_DIR / "static"
 FRONTEND_DIR = BASE_DIR / "frontend"
 DATA_DIR = BASE_DIR / "data"
 
-for directory in (PDF_DIR, OUT_DIR, STATIC_DIR, FRONTEND_DIR, DATA_DIR):
-    directory.mkdir(parents=True, exist_ok=True)
-
 INDEX_HTML = FRONTEND_DIR / "index.html"
 RECORDS_JSON_PATH = DATA_DIR / "records.json"
 RECORDS_CSV_PATH = DATA_DIR / "records.csv"
 RECORDS_XLSX_PATH = DATA_DIR / "records.xlsx"
 RECORDS_LOCK_PATH = DATA_DIR / "records.lock"
+RECORDS_LOG_PATH = DATA_DIR / "records.jsonl"
+RECORDS_FLUSH_DELAY_SECONDS = float(os.getenv("ACM_META_RECORDS_FLUSH_DELAY", "2.0"))
 
 CSV_COLUMNS = [
     "Title",
@@ -35,7 +35,23 @@ MAX_UPLOAD_BATCH = 20
 MAX_UPLOAD_SIZE_MB = int(os.getenv("ACM_META_MAX_UPLOAD_MB", "25"))
 MAX_UPLOAD_SIZE_BYTES = MAX_UPLOAD_SIZE_MB * 1024 * 1024
 UPLOAD_CHUNK_SIZE = 1024 * 1024  # 1MB chunks keep memory usage low during uploads
+# Uploads written/parsed/resolved at the same time by the web API.
+UPLOAD_CONCURRENCY = int(os.getenv("ACM_META_PIPELINE_CONCURRENCY", "4"))
 ALLOWED_UPLOAD_CONTENT_TYPES = {
     "application/pdf",
     "application/octet-stream",
 }
+# PyMuPDF parsing gains little past ~8 processes and each one costs start-up time.
+PDF_PARSE_WORKERS = int(os.getenv("ACM_META_PDF_WORKERS", str(min(os.cpu_count() or 1, 8))))
+CROSSREF_CONCURRENCY = int(os.getenv("ACM_META_CROSSREF_CONCURRENCY", "8"))
+CROSSREF_BULK_SIZE = 20  # DOIs per /works?filter=doi:... request
+CROSSREF_CACHE_PATH = DATA_DIR / "crossref_cache.sqlite"
+CROSSREF_CACHE_TTL_SECONDS = int(os.getenv("ACM_META_CROSSREF_CACHE_TTL", str(30 * 24 * 3600)))
+
+
+@lru_cache(maxsize=None)
+def ensure_dirs() -> None:
+    """Create the working directories once per process (not on every import)."""
+
+    for directory in (PDF_DIR, OUT_DIR, STATIC_DIR, FRONTEND_DIR, DATA_DIR):
+        directory.mkdir(parents=True, exist_ok=True)
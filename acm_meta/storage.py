@@ -2,38 +2,44 @@
 
 from __future__ import annotations
 
-import json
+import atexit
+import csv
 import logging
+import operator
+import os
 import shutil
 import threading
-from contextlib import suppress
+from contextlib import contextmanager, suppress
 from pathlib import Path
-from typing import Dict, List, Optional, Sequence
+from typing import Any, Dict, Iterator, List, Optional, Sequence
+from uuid import uuid4
 
 try:
     import fcntl  # type: ignore[attr-defined]
 except ImportError:  # pragma: no cover - Windows fallback
     fcntl = None
 
-import pandas as pd
+import orjson
 
-from .models import EDITABLE_COLUMNS, PaperRecord, rows_from_records
+from .models import EDITABLE_COLUMNS, PaperRecord
 from .settings import (
     CSV_COLUMNS,
     RECORDS_CSV_PATH,
+    RECORDS_FLUSH_DELAY_SECONDS,
     RECORDS_JSON_PATH,
     RECORDS_LOCK_PATH,
+    RECORDS_LOG_PATH,
     RECORDS_XLSX_PATH,
+    ensure_dirs,
 )
 
 
 logger = logging.getLogger(__name__)
 
 
-def _atomic_write_bytes(path: Path, data: bytes) -> None:
-    tmp_path = path.with_suffix(path.suffix + ".tmp")
-    tmp_path.write_bytes(data)
-    tmp_path.replace(path)
+def _scratch_path(path: Path) -> Path:
+    # Per-process name so concurrent writers never share a temp file.
+    return path.with_name(f"{path.name}.{os.getpid()}.tmp")
 
 
 def _backup_file(path: Path, suffix: str = ".bak") -> None:
@@ -45,6 +51,21 @@ def _backup_file(path: Path, suffix: str = ".bak") -> None:
             logger.warning("Failed to create backup for %s", path)
 
 
+# Legacy dicts always carry every CSV column, so a C-level getter builds each row.
+_csv_row = operator.itemgetter(*CSV_COLUMNS)
+# Log segment already covered by an in-progress snapshot write.
+_ROTATED_LOG_PATH = RECORDS_LOG_PATH.with_name(RECORDS_LOG_PATH.name + ".1")
+
+
+def write_records_csv(path: Path, records: Sequence[PaperRecord]) -> None:
+    """Stream records to a spreadsheet-friendly CSV (UTF-8 with BOM for Excel)."""
+
+    with path.open("w", encoding="utf-8-sig", newline="", buffering=1 << 20) as handle:
+        writer = csv.writer(handle)
+        writer.writerow(CSV_COLUMNS)
+        writer.writerows(_csv_row(record.legacy) for record in records)
+
+
 class _FileLock:
     """Minimal cross-platform lock that prefers fcntl when available."""
 
@@ -60,12 +81,22 @@ class _FileLock:
     def __exit__(self, exc_type, exc, tb):
         self.release()
 
-    def acquire(self) -> None:
+    @contextmanager
+    def shared(self) -> Iterator["_FileLock"]:
+        """Hold LOCK_SH so other processes can read alongside us but not write."""
+
+        self.acquire(shared=True)
+        try:
+            yield self
+        finally:
+            self.release()
+
+    def acquire(self, *, shared: bool = False) -> None:
         self._thread_lock.acquire()
         if fcntl:
             self._path.parent.mkdir(parents=True, exist_ok=True)
             handle = self._path.open("a+")
-            fcntl.flock(handle.fileno(), fcntl.LOCK_EX)
+            fcntl.flock(handle.fileno(), fcntl.LOCK_SH if shared else fcntl.LOCK_EX)
             self._handle = handle
 
     def release(self) -> None:
@@ -77,24 +108,59 @@ class _FileLock:
 
 
 class RecordStore:
+    """In-memory record list backed by records.json/csv plus an append-only log.
+
+    Mutations append one line to records.jsonl and mark the store dirty; the
+    full JSON/CSV snapshots are rewritten by a debounced background flush (or
+    an explicit flush()/compact()) that snapshots the list under the lock and
+    writes the files after releasing it, then drops the log segment it covered.
+    On start any log entries newer than records.json are replayed.
+    """
+
     def __init__(self) -> None:
+        ensure_dirs()
         self._records: List[PaperRecord] = []
+        # Side indexes: record id -> list position, normalized DOI -> record id.
+        self._by_id: Dict[str, int] = {}
+        self._by_doi: Dict[str, str] = {}
         self._lock = threading.Lock()
+        self._disk_lock = threading.Lock()
         self._file_lock = _FileLock(RECORDS_LOCK_PATH)
+        self._log_handle = None
+        self._dirty = False
+        self._flush_timer: Optional[threading.Timer] = None
+        # Bumped on every mutation; the random epoch keeps ETags unique across restarts.
+        self._epoch = uuid4().hex[:8]
+        self._version = 0
+        self._reversed_cache: Optional[List[Dict]] = None
+        self._xlsx_lock = threading.Lock()
+        self._xlsx_version: Optional[int] = None
+        self._json_export: Optional[tuple[int, bytes]] = None
         self._load()
+        atexit.register(self.flush)
 
     def _normalize_doi(self, doi: str) -> str:
         return (doi or "").strip().lower()
 
     def _load(self) -> None:
+        with self._file_lock.shared():
+            stale = self._load_files()
+        if stale:
+            self.compact()
+
+    def _load_files(self) -> bool:
+        """Read records.json and replay the log; return True if the snapshot files need rewriting."""
+
         raw_data: List[Dict] = []
+        raw_bytes: Optional[bytes] = None
         corrupt_detected = False
         if RECORDS_JSON_PATH.exists():
             try:
-                parsed = json.loads(RECORDS_JSON_PATH.read_text(encoding="utf-8"))
+                raw_bytes = RECORDS_JSON_PATH.read_bytes()
+                parsed = orjson.loads(raw_bytes)
                 if isinstance(parsed, list):
                     raw_data = parsed
-            except json.JSONDecodeError:
+            except orjson.JSONDecodeError:
                 corrupt_detected = True
                 logger.warning("records.json is corrupted; preserving copy for manual recovery")
                 corrupt_path = RECORDS_JSON_PATH.with_name(RECORDS_JSON_PATH.name + ".corrupt")
@@ -106,97 +172,264 @@ class RecordStore:
                 records.append(PaperRecord.from_legacy_dict(item))
 
         self._records = records
-        if not corrupt_detected:
-            self._persist_files()
-
-    def _persist_files(self) -> None:
-        rows = [record.to_legacy_dict() for record in self._records]
+        self._reindex()
+        replayed = self._replay_log()
+        if corrupt_detected:
+            return False
+        # Rewrite only when the log had entries, the CSV is missing, or loading
+        # normalized something (legacy schema, old pretty-printed JSON, ...).
+        return replayed or not RECORDS_CSV_PATH.exists() or raw_bytes != self._encode_rows()
+
+    def _replay_log(self) -> bool:
+        # A rotated log left behind by an interrupted flush predates the live one.
+        replayed = False
+        for path in (_ROTATED_LOG_PATH, RECORDS_LOG_PATH):
+            if path.exists():
+                self._replay_log_file(path)
+                replayed = True
+        return replayed
+
+    def _replay_log_file(self, path: Path) -> None:
+        with path.open("rb") as handle:
+            for line_no, line in enumerate(handle, start=1):
+                if not line.strip():
+                    continue
+                try:
+                    entry = orjson.loads(line)
+                except orjson.JSONDecodeError:
+                    # A crash mid-append leaves at most one truncated line.
+                    logger.warning("Skipping unreadable records.jsonl line %s", line_no)
+                    continue
+                op = entry.get("op")
+                if op == "put" and isinstance(entry.get("record"), dict):
+                    self._apply_put(PaperRecord.from_legacy_dict(entry["record"]))
+                elif op == "del":
+                    self._apply_delete(entry.get("id", ""))
+                elif op == "order" and isinstance(entry.get("ids"), list):
+                    self._apply_order(entry["ids"])
+
+    def _append_log(self, entry: Dict[str, Any]) -> None:
+        line = orjson.dumps(entry, option=orjson.OPT_APPEND_NEWLINE | orjson.OPT_NON_STR_KEYS)
         with self._file_lock:
-            _backup_file(RECORDS_JSON_PATH)
-            _atomic_write_bytes(
-                RECORDS_JSON_PATH,
-                json.dumps(rows, ensure_ascii=False, indent=2).encode("utf-8"),
-            )
-            export_rows = rows_from_records(self._records)
-            df = pd.DataFrame(export_rows, columns=CSV_COLUMNS)
-            tmp_csv = RECORDS_CSV_PATH.with_suffix(".csv.tmp")
-            df.to_csv(tmp_csv, index=False, encoding="utf-8-sig")
-            _backup_file(RECORDS_CSV_PATH)
+            if self._log_handle is None:
+                self._log_handle = RECORDS_LOG_PATH.open("ab", buffering=1 << 20)
+            self._log_handle.write(line)
+            self._log_handle.flush()
+        self._mark_dirty()
+
+    def _mark_dirty(self) -> None:
+        self._version += 1
+        self._reversed_cache = None
+        self._dirty = True
+        if self._flush_timer is None:
+            timer = threading.Timer(RECORDS_FLUSH_DELAY_SECONDS, self.flush)
+            timer.daemon = True
+            self._flush_timer = timer
+            timer.start()
+
+    def _encode_rows(self, records: Optional[List[PaperRecord]] = None) -> bytes:
+        rows = self._records if records is None else records
+        return orjson.dumps([record.legacy for record in rows], option=orjson.OPT_NON_STR_KEYS)
+
+    def _persist_files(self, records: List[PaperRecord]) -> None:
+        # The rewrite and backups run without the file lock, which log appends
+        # need; it is held only to swap the finished files into place.
+        tmp_json = _scratch_path(RECORDS_JSON_PATH)
+        tmp_json.write_bytes(self._encode_rows(records))
+        tmp_csv = _scratch_path(RECORDS_CSV_PATH)
+        write_records_csv(tmp_csv, records)
+        _backup_file(RECORDS_JSON_PATH)
+        _backup_file(RECORDS_CSV_PATH)
+        with self._file_lock:
+            tmp_json.replace(RECORDS_JSON_PATH)
             tmp_csv.replace(RECORDS_CSV_PATH)
 
+    def _rotate_log(self) -> None:
+        """Move the live log aside so mutations after the snapshot land in a fresh file."""
+
+        with self._file_lock:
+            if self._log_handle is not None:
+                self._log_handle.close()
+                self._log_handle = None
+            if not RECORDS_LOG_PATH.exists():
+                return
+            if _ROTATED_LOG_PATH.exists():
+                # A previous flush failed before writing its snapshot; keep both.
+                with _ROTATED_LOG_PATH.open("ab") as rotated:
+                    rotated.write(RECORDS_LOG_PATH.read_bytes())
+                RECORDS_LOG_PATH.unlink()
+            else:
+                RECORDS_LOG_PATH.replace(_ROTATED_LOG_PATH)
+
+    def _checkpoint(self, *, force: bool) -> None:
+        # Only the in-memory snapshot and log rotation happen under self._lock;
+        # the JSON/CSV rewrite runs outside it so uploads and reads are not
+        # serialized behind disk IO. _disk_lock keeps checkpoints in order.
+        with self._disk_lock:
+            with self._lock:
+                if self._flush_timer is not None:
+                    self._flush_timer.cancel()
+                    self._flush_timer = None
+                if not (force or self._dirty):
+                    return
+                records = list(self._records)
+                self._rotate_log()
+                self._dirty = False
+            try:
+                self._persist_files(records)
+            except Exception:
+                with self._lock:
+                    self._dirty = True
+                raise
+            # records.json now holds every rotated mutation, so that log can go.
+            with self._file_lock:
+                with suppress(FileNotFoundError):
+                    _ROTATED_LOG_PATH.unlink()
+
+    def compact(self) -> None:
+        """Rewrite records.json/csv from memory and truncate the mutation log."""
+
+        self._checkpoint(force=True)
+
+    def flush(self) -> None:
+        self._checkpoint(force=False)
+
+    def _reindex(self) -> None:
+        self._by_id = {record.id: idx for idx, record in enumerate(self._records)}
+        self._by_doi = {}
+        for record in self._records:
+            doi = self._normalize_doi(record.doi)
+            if doi:
+                # First record wins, matching the old linear scan.
+                self._by_doi.setdefault(doi, record.id)
+
+    def _apply_put(self, record: PaperRecord) -> None:
+        idx = self._by_id.get(record.id)
+        if idx is None:
+            self._by_id[record.id] = len(self._records)
+            self._records.append(record)
+            doi = self._normalize_doi(record.doi)
+            if doi:
+                self._by_doi.setdefault(doi, record.id)
+            return
+        previous = self._records[idx]
+        self._records[idx] = record
+        if self._normalize_doi(previous.doi) != self._normalize_doi(record.doi):
+            self._reindex()
+
+    def _apply_delete(self, record_id: str) -> bool:
+        idx = self._by_id.get(record_id)
+        if idx is None:
+            return False
+        del self._records[idx]
+        self._reindex()
+        return True
+
+    def _apply_order(self, order: Sequence[str]) -> None:
+        id_to_record = {record.id: record for record in self._records}
+        new_list: List[PaperRecord] = []
+        seen = set()
+        for record_id in order:
+            record = id_to_record.get(record_id)
+            if record and record_id not in seen:
+                new_list.append(record)
+                seen.add(record_id)
+        for record in self._records:
+            if record.id not in seen:
+                new_list.append(record)
+        self._records = new_list
+        self._reindex()
+
     def snapshot(self) -> List[Dict]:
         with self._lock:
-            return [record.to_legacy_dict() for record in self._records]
+            return [record.legacy for record in self._records]
 
     def reversed_snapshot(self) -> List[Dict]:
+        # Readers share the cached list without taking the lock; mutators only
+        # ever swap the attribute, so a reader sees either the old or new list.
+        cached = self._reversed_cache
+        if cached is not None:
+            return cached
         with self._lock:
-            return [record.to_legacy_dict() for record in reversed(self._records)]
+            if self._reversed_cache is None:
+                self._reversed_cache = [record.legacy for record in reversed(self._records)]
+            return self._reversed_cache
+
+    @property
+    def etag(self) -> str:
+        """Validator for the current record list, suitable for an HTTP ETag header."""
+
+        return f'"{self._epoch}-{self._version}"'
 
     def upsert(self, record: PaperRecord) -> PaperRecord:
         with self._lock:
-            for idx, existing in enumerate(self._records):
-                if existing.id == record.id:
-                    self._records[idx] = record
-                    break
-            else:
-                self._records.append(record)
-            self._persist_files()
+            self._apply_put(record)
+            self._append_log({"op": "put", "record": record.legacy})
             return record
 
     def get_by_id(self, record_id: str) -> Optional[PaperRecord]:
         with self._lock:
-            for record in self._records:
-                if record.id == record_id:
-                    return record
-        return None
+            idx = self._by_id.get(record_id)
+            return self._records[idx] if idx is not None else None
 
     def find_by_doi(self, doi: str) -> Optional[PaperRecord]:
         normalized = self._normalize_doi(doi)
         if not normalized:
             return None
         with self._lock:
-            for record in self._records:
-                if self._normalize_doi(record.doi) == normalized:
-                    return record
-        return None
+            record_id = self._by_doi.get(normalized)
+            if record_id is None:
+                return None
+            return self._records[self._by_id[record_id]]
 
     def delete(self, record_id: str) -> bool:
         with self._lock:
-            for idx, record in enumerate(self._records):
-                if record.id == record_id:
-                    del self._records[idx]
-                    self._persist_files()
-                    return True
-            return False
+            if not self._apply_delete(record_id):
+                return False
+            self._append_log({"op": "del", "id": record_id})
+            return True
 
     def reorder(self, order: Sequence[str]) -> None:
         with self._lock:
-            id_to_record = {record.id: record for record in self._records}
-            new_list: List[PaperRecord] = []
-            seen = set()
-            for record_id in order:
-                record = id_to_record.get(record_id)
-                if record and record_id not in seen:
-                    new_list.append(record)
-                    seen.add(record_id)
-            for record in self._records:
-                if record.id not in seen:
-                    new_list.append(record)
-            self._records = new_list
-            self._persist_files()
+            self._apply_order(order)
+            self._append_log({"op": "order", "ids": [record.id for record in self._records]})
 
-    def export_xlsx(self) -> Path:
-        with self._lock:
-            export_rows = rows_from_records(self._records)
-        df = pd.DataFrame(export_rows, columns=CSV_COLUMNS)
-        tmp_path = RECORDS_XLSX_PATH.with_suffix(".xlsx.tmp")
-        df.to_excel(tmp_path, index=False)
-        tmp_path.replace(RECORDS_XLSX_PATH)
-        return RECORDS_XLSX_PATH
+    def export_json(self) -> bytes:
+        """Pretty-printed JSON download body, rebuilt only after a mutation."""
 
-    def flush(self) -> None:
         with self._lock:
-            self._persist_files()
+            cached = self._json_export
+            if cached is not None and cached[0] == self._version:
+                return cached[1]
+            version = self._version
+            rows = [record.legacy for record in self._records]
+        # records.json on disk is compact; indent only the human-facing download.
+        body = orjson.dumps(rows, option=orjson.OPT_INDENT_2)
+        self._json_export = (version, body)
+        return body
+
+    def export_xlsx(self) -> Path:
+        # One builder at a time; a workbook already built for this version is reused.
+        with self._xlsx_lock:
+            with self._lock:
+                version = self._version
+                if version == self._xlsx_version and RECORDS_XLSX_PATH.exists():
+                    return RECORDS_XLSX_PATH
+                export_rows = [_csv_row(record.legacy) for record in self._records]
+            # openpyxl is only needed here; importing it lazily keeps server start fast.
+            from openpyxl import Workbook
+
+            # Write-only workbooks stream rows straight into the zip container.
+            workbook = Workbook(write_only=True)
+            sheet = workbook.create_sheet()
+            sheet.append(CSV_COLUMNS)
+            for row in export_rows:
+                sheet.append(row)
+            tmp_path = RECORDS_XLSX_PATH.with_suffix(".xlsx.tmp")
+            workbook.save(tmp_path)
+            tmp_path.replace(RECORDS_XLSX_PATH)
+            self._xlsx_version = version
+        return RECORDS_XLSX_PATH
 
     def update_fields(self, record_id: str, updates: Dict[str, object]) -> Dict:
         if not updates:
@@ -205,12 +438,12 @@ class RecordStore:
             if field not in EDITABLE_COLUMNS:
                 raise ValueError(f"Field {field} not editable")
         with self._lock:
-            for idx, record in enumerate(self._records):
-                if record.id == record_id:
-                    legacy = record.to_legacy_dict()
-                    legacy.update(updates)
-                    updated = PaperRecord.from_legacy_dict(legacy)
-                    self._records[idx] = updated
-                    self._persist_files()
-                    return updated.to_legacy_dict()
-        raise KeyError(f"Record {record_id} not found")
+            idx = self._by_id.get(record_id)
+            if idx is None:
+                raise KeyError(f"Record {record_id} not found")
+            legacy = self._records[idx].to_legacy_dict()
+            legacy.update(updates)
+            updated = PaperRecord.from_legacy_dict(legacy)
+            self._apply_put(updated)
+            self._append_log({"op": "put", "record": updated.legacy})
+            return updated.to_legacy_dict()
@@ -1,12 +1,20 @@
 import argparse
+import asyncio
+import hashlib
 import logging
+from contextlib import asynccontextmanager
+from functools import lru_cache
 
 from typing import Optional, Union
 
+import orjson
 from dotenv import load_dotenv
-from fastapi import FastAPI, File, HTTPException, UploadFile
-from fastapi.responses import FileResponse, JSONResponse
+from fastapi import FastAPI, File, HTTPException, Query, Request, Response, UploadFile
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import FileResponse, JSONResponse, StreamingResponse
 from fastapi.staticfiles import StaticFiles
+from starlette.datastructures import MutableHeaders
+from starlette.middleware.gzip import DEFAULT_EXCLUDED_CONTENT_TYPES
 try:
     from pydantic import BaseModel, Field, ConfigDict
 except ImportError:  # pragma: no cover - pydantic v1 fallback
@@ -22,9 +30,9 @@ from acm_meta.settings import (
     MAX_UPLOAD_BATCH,
     PDF_DIR,
     RECORDS_CSV_PATH,
-    RECORDS_JSON_PATH,
     RECORDS_XLSX_PATH,
     STATIC_DIR,
+    ensure_dirs,
 )
 from acm_meta.storage import RecordStore
 
@@ -37,6 +45,15 @@ logging.basicConfig(
 )
 logger = logging.getLogger("acm_meta")
 
+_XLSX_MEDIA_TYPE = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+
+
+class OrjsonResponse(JSONResponse):
+    """JSONResponse rendered by orjson; the record list is the hot path."""
+
+    def render(self, content) -> bytes:
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
+
 
 class ReorderPayload(BaseModel):
     order: list[str]
@@ -57,19 +74,81 @@ class RecordPatchPayload(BaseModel):
             allow_population_by_field_name = True
 
 
+ensure_dirs()
 store = RecordStore()
 crossref_client = CrossrefClient()
 pipeline = MetadataPipeline(store, crossref_client)
 
-app = FastAPI(title="ACM Meta MVP")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Build the Crossref connection pool now rather than inside the first upload.
+    await pipeline.async_client.open()
+    yield
+    await pipeline.async_client.close()
+
+
+class WeakETagOnEncodingMiddleware:
+    """Downgrade strong ETags on responses that GZipMiddleware re-encoded.
+
+    A strong validator promises byte-identical bodies, which no longer holds
+    once the same resource may go out gzip-encoded or as identity.
+    """
+
+    def __init__(self, app) -> None:
+        self.app = app
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        async def send_with_weak_etag(message) -> None:
+            if message["type"] == "http.response.start":
+                headers = MutableHeaders(scope=message)
+                etag = headers.get("etag")
+                if etag and not etag.startswith("W/") and "content-encoding" in headers:
+                    headers["etag"] = f"W/{etag}"
+            await send(message)
+
+        await self.app(scope, receive, send_with_weak_etag)
+
+
+app = FastAPI(title="ACM Meta MVP", lifespan=lifespan)
+# Record lists and CSV/JSON exports are repetitive text that compresses well.
+# Workbooks are already zip containers, and NDJSON must reach the client per
+# line instead of sitting in the compressor's buffer.
+app.add_middleware(
+    GZipMiddleware,
+    minimum_size=1024,
+    compresslevel=5,
+    exclude_content_types=DEFAULT_EXCLUDED_CONTENT_TYPES + (_XLSX_MEDIA_TYPE, "application/x-ndjson"),
+)
+# Added last so it wraps GZipMiddleware and sees the final Content-Encoding.
+app.add_middleware(WeakETagOnEncodingMiddleware)
 app.mount("/static", StaticFiles(directory=STATIC_DIR), name="static")
 
 
-def dump_by_alias(model: BaseModel, *, exclude_unset: bool = True) -> dict:
-    try:
-        return model.model_dump(by_alias=True, exclude_unset=exclude_unset)
-    except AttributeError:  # pragma: no cover - Pydantic v1 fallback
-        return model.dict(by_alias=True, exclude_unset=exclude_unset)
+def _alias_dumper(model_cls: type[BaseModel]):
+    """Build ``dump(model) -> {alias: value}`` over the explicitly set fields.
+
+    Aliases are resolved once per class, so each call is a plain dict
+    comprehension instead of a full model_dump(by_alias=True, exclude_unset=True).
+    """
+
+    fields = getattr(model_cls, "model_fields", None) or model_cls.__fields__  # type: ignore[attr-defined]
+    aliases = {name: field.alias or name for name, field in fields.items()}
+
+    def dump(model: BaseModel) -> dict:
+        fields_set = getattr(model, "model_fields_set", None)
+        if fields_set is None:  # pragma: no cover - Pydantic v1 fallback
+            fields_set = model.__fields_set__
+        return {aliases[name]: getattr(model, name) for name in fields_set}
+
+    return dump
+
+
+dump_patch_by_alias = _alias_dumper(RecordPatchPayload)
 
 
 async def process_upload_file(file: UploadFile) -> UploadResponseItem:
@@ -84,26 +163,45 @@ async def process_upload_file(file: UploadFile) -> UploadResponseItem:
         return UploadResponseItem.failure(file.filename, code=MetaErrorCode.UNKNOWN_ERROR.value, message=str(exc))
 
 
-@app.get("/", response_class=FileResponse)
-def read_index():
-    return FileResponse(INDEX_HTML)
+@lru_cache(maxsize=1)
+def _index_page() -> tuple[bytes, str]:
+    body = INDEX_HTML.read_bytes()
+    return body, f'W/"{hashlib.blake2b(body, digest_size=8).hexdigest()}"'
+
+
+@app.get("/")
+def read_index(request: Request):
+    # The single-page shell is read once per process; browsers revalidate it via ETag.
+    body, etag = _index_page()
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if _not_modified(request, etag):
+        return Response(status_code=304, headers=headers)
+    return Response(body, media_type="text/html", headers=headers)
 
 
 @app.post("/api/upload")
 async def upload(file: UploadFile = File(...)):
     result = await process_upload_file(file)
     status_code = 200 if result.status == "ok" else 400
-    return JSONResponse(result.to_payload(), status_code=status_code)
+    return OrjsonResponse(result.to_payload(), status_code=status_code)
+
+
+# Only the messages are shared: re-raising one HTTPException instance would keep
+# growing its __traceback__ and leak frames across requests.
+_NO_FILES_DETAIL = "No files provided"
+_TOO_MANY_FILES_DETAIL = f"Maximum {MAX_UPLOAD_BATCH} files per upload"
 
 
 @app.post("/api/upload/batch")
 async def upload_batch(files: list[UploadFile] = File(...)):
     if not files:
-        raise HTTPException(status_code=400, detail="No files provided")
+        raise HTTPException(status_code=400, detail=_NO_FILES_DETAIL)
     if len(files) > MAX_UPLOAD_BATCH:
-        raise HTTPException(status_code=400, detail=f"Maximum {MAX_UPLOAD_BATCH} files per upload")
+        raise HTTPException(status_code=400, detail=_TOO_MANY_FILES_DETAIL)
 
-    results = [await process_upload_file(upload_file) for upload_file in files]
+    # Each upload streams to disk and then parses/looks up in a worker thread,
+    # so running them together overlaps the Crossref round trips.
+    results = await asyncio.gather(*(process_upload_file(upload_file) for upload_file in files))
     success = any(item.status == "ok" for item in results)
     body: dict[str, object] = {
         "status": "ok" if success else "error",
@@ -115,12 +213,51 @@ async def upload_batch(files: list[UploadFile] = File(...)):
             body["error"] = failure.message
             body["code"] = failure.error_code
     status_code = 200 if success else 400
-    return JSONResponse(body, status_code=status_code)
+    return OrjsonResponse(body, status_code=status_code)
+
+
+def _variant_etag(variant: Optional[str] = None) -> str:
+    # Each representation of the same store version needs its own validator.
+    # They are weak because GZipMiddleware may send the body gzip-encoded.
+    tag = store.etag if variant is None else f'{store.etag[:-1]}-{variant}"'
+    return f"W/{tag}"
+
+
+def _not_modified(request: Request, etag: str) -> bool:
+    # If-None-Match uses weak comparison: W/ prefixes are ignored.
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    wanted = etag.removeprefix("W/")
+    return any(tag.strip().removeprefix("W/") == wanted for tag in header.split(","))
+
+
+def _ndjson_lines(records: list[dict]):
+    for record in records:
+        yield orjson.dumps(record) + b"\n"
 
 
 @app.get("/api/records")
-def list_records():
-    return {"records": store.reversed_snapshot()}
+def list_records(
+    request: Request,
+    format: str = "json",
+    limit: Optional[int] = Query(None, ge=1),
+    offset: int = Query(0, ge=0),
+):
+    # Read the validator first: a concurrent edit then only makes it stale, never ahead.
+    etag = _variant_etag("ndjson" if format == "ndjson" else None)
+    if _not_modified(request, etag):
+        return Response(status_code=304, headers={"ETag": etag})
+    records = store.reversed_snapshot()
+    headers = {"ETag": etag, "X-Total-Count": str(len(records))}
+    if limit is not None or offset:
+        records = records[offset : offset + limit if limit is not None else None]
+    if format == "ndjson":
+        # One record per line so large stores start streaming immediately.
+        return StreamingResponse(_ndjson_lines(records), media_type="application/x-ndjson", headers=headers)
+    return OrjsonResponse({"records": records}, headers=headers)
 
 
 @app.delete("/api/records/{record_id:path}")
@@ -140,9 +277,17 @@ def reorder_records(payload: ReorderPayload):
 
 @app.patch("/api/records/{record_id:path}")
 def patch_record(record_id: str, payload: RecordPatchPayload):
-    updates = dump_by_alias(payload)
+    updates = dump_patch_by_alias(payload)
     if not updates:
         raise HTTPException(status_code=400, detail="No fields provided")
+    current = store.get_by_id(record_id)
+    if current is None:
+        raise HTTPException(status_code=404, detail=f"Record {record_id} not found")
+    # Auto-save retries often resend unchanged values; skip the log write for those.
+    stored = current.legacy
+    updates = {field: value for field, value in updates.items() if stored.get(field) != value}
+    if not updates:
+        return {"status": "noop", "record": current.to_legacy_dict()}
     try:
         record = store.update_fields(record_id, updates)
     except ValueError as exc:
@@ -153,21 +298,33 @@ def patch_record(record_id: str, payload: RecordPatchPayload):
 
 
 @app.get("/api/export")
-def export_records():
+def export_records(request: Request):
+    etag = _variant_etag("csv")
+    if _not_modified(request, etag):
+        return Response(status_code=304, headers={"ETag": etag})
     store.flush()
-    return FileResponse(RECORDS_CSV_PATH, filename="metadata_records.csv")
+    return FileResponse(RECORDS_CSV_PATH, filename="metadata_records.csv", headers={"ETag": etag})
 
 
 @app.get("/api/export/json")
-def export_records_json():
-    store.flush()
-    return FileResponse(RECORDS_JSON_PATH, filename="metadata_records.json")
+def export_records_json(request: Request):
+    etag = _variant_etag("json-export")
+    if _not_modified(request, etag):
+        return Response(status_code=304, headers={"ETag": etag})
+    return Response(
+        store.export_json(),
+        media_type="application/json",
+        headers={"Content-Disposition": 'attachment; filename="metadata_records.json"', "ETag": etag},
+    )
 
 
 @app.get("/api/export/xlsx")
-def export_records_xlsx():
+def export_records_xlsx(request: Request):
+    etag = _variant_etag("xlsx")
+    if _not_modified(request, etag):
+        return Response(status_code=304, headers={"ETag": etag})
     path = store.export_xlsx()
-    return FileResponse(path, filename=RECORDS_XLSX_PATH.name)
+    return FileResponse(path, filename=RECORDS_XLSX_PATH.name, media_type=_XLSX_MEDIA_TYPE, headers={"ETag": etag})
 
 
 def main() -> None: